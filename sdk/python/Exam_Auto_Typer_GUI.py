@@ -1,16 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pyautogui
 import keyboard
+import asyncio
 import threading
 import time
 import random
 import pyperclip
 import sys
 
-# Disable pyautogui's failsafe (corner of screen will not terminate)
-pyautogui.FAILSAFE = True
-
 # --- Configuration & Theme ---
 COLORS = {
     'bg': '#1e1e1e',
@@ -25,14 +22,29 @@ COLORS = {
 
 # --- Auto-Typer Logic ---
 class AutoTyper:
-    def __init__(self):
+    def __init__(self, loop):
         self.running = False
         self.paused = False
-        self.stop_requested = False
         self.text_to_type = ""
         self.speed_cpm = 1200  # Default chars per minute
         self.jitter = 0.05      # Random deviation percentage
-        self.typing_thread = None
+        
+        # Typing runs as a coroutine on the app's shared event loop thread
+        self.loop = loop
+        self.typing_future = None
+        self._resume_event, self._stop_event = asyncio.run_coroutine_threadsafe(
+            self._make_events(), loop).result()
+
+    async def _make_events(self):
+        # On 3.8/3.9 asyncio.Event binds to the loop current where it is built, so
+        # build the resume (set while not paused) and stop events on the loop thread
+        resume_event = asyncio.Event()
+        resume_event.set()
+        return resume_event, asyncio.Event()
+
+    def _signal(self, event, on=True):
+        # asyncio.Event is not thread-safe; flip it from the loop thread
+        self.loop.call_soon_threadsafe(event.set if on else event.clear)
 
     def start_typing(self, text, speed_cpm, progress_callback, finish_callback):
         if self.running:
@@ -40,32 +52,38 @@ class AutoTyper:
         
         self.text_to_type = text
         self.speed_cpm = speed_cpm
+        # Jitter bounds are fixed for the session: delay = base * (lo + span * random())
+        self._jitter_lo = 1.0 - self.jitter
+        self._jitter_span = 2.0 * self.jitter
         self.running = True
         self.paused = False
-        self.stop_requested = False
+        self._stop_event.clear()
+        self._signal(self._resume_event)
         
-        self.typing_thread = threading.Thread(target=self._type_loop, args=(progress_callback, finish_callback), daemon=True)
-        self.typing_thread.start()
+        self.typing_future = asyncio.run_coroutine_threadsafe(self._type_loop(progress_callback, finish_callback), self.loop)
 
     def pause(self):
         self.paused = True
+        self._signal(self._resume_event, on=False)
 
     def resume(self):
         self.paused = False
+        self._signal(self._resume_event)
 
     def stop(self):
-        self.stop_requested = True
         self.running = False
         self.paused = False
+        self._signal(self._stop_event)
+        self._signal(self._resume_event)  # Wake a paused loop so it can exit
 
-    def _type_loop(self, progress_callback, finish_callback):
+    async def _type_loop(self, progress_callback, finish_callback):
         # Countdown
         for i in range(5, 0, -1):
-            if self.stop_requested: break
+            if self._stop_event.is_set(): break
             progress_callback(0, f"Starting in {i}s... SWITCH WINDOW!")
-            time.sleep(1)
+            await asyncio.sleep(1)
         
-        if self.stop_requested:
+        if self._stop_event.is_set():
             finish_callback(False)
             return
 
@@ -73,49 +91,49 @@ class AutoTyper:
         
         total_chars = len(self.text_to_type)
         base_delay = 60.0 / self.speed_cpm
+        lo, span = self._jitter_lo, self._jitter_span
+        # Session-private generator: no other thread shares its state
+        rand = random.Random().random
         
         chars_typed = 0
+        # Report progress at most every 50 ms of wall time rather than on every char
+        clock = time.perf_counter
+        next_report = clock() + 0.05
         
         for char in self.text_to_type:
             # Check for Stop/Abort
-            if self.stop_requested or keyboard.is_pressed('esc'):
-                self.stop_requested = True
+            if self._stop_event.is_set() or keyboard.is_pressed('esc'):
+                self._stop_event.set()
                 break
             
-            # Check for Pause
-            while self.paused:
-                if self.stop_requested: break
-                time.sleep(0.1)
+            # Check for Pause (blocks without polling until resumed or stopped)
+            if self.paused:
                 progress_callback(chars_typed, "Paused")
+                await self._resume_event.wait()
             
-            if self.stop_requested: break
+            if self._stop_event.is_set(): break
 
             # Type the character
             try:
-                # Handle special characters or newlines if needed
-                if char == '\n':
-                    pyautogui.press('enter')
-                else:
-                    # Use clipboard + paste for better compatibility with accented characters
-                    pyperclip.copy(char)
-                    pyautogui.hotkey('ctrl', 'v')
+                # keyboard.write sends newlines as Enter and falls back to Unicode
+                # events itself for characters without a scan code (accents etc.)
+                keyboard.write(char)
                 
                 chars_typed += 1
                 
-                # Update progress every 5 chars to avoid UI lag
-                if chars_typed % 5 == 0:
+                if chars_typed == total_chars or clock() >= next_report:
                     progress_callback(chars_typed, f"Typing... {int((chars_typed/total_chars)*100)}%")
+                    next_report = clock() + 0.05
 
                 # Calculate sleep with jitter
-                delay = base_delay * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
-                time.sleep(delay)
+                delay = base_delay * (lo + span * rand())
+                await asyncio.sleep(delay)
 
             except Exception as e:
                 print(f"Error typing: {e}")
                 break
 
         self.running = False
-        self.stop_requested = False 
         finish_callback(True)
 
 
@@ -128,7 +146,13 @@ class AutoTyperApp:
         self.root.configure(bg=COLORS['bg'])
         self.root.attributes("-topmost", True) # Keep on top initially (optional, maybe distracting)
 
-        self.typer = AutoTyper()
+        # One event loop thread for the app lifetime; typing sessions run on it as coroutines
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+        self.typer = AutoTyper(self.loop)
+        self._pending_update = None
+        self._update_scheduled = False
         
         self.setup_ui()
         self.setup_bindings()
@@ -225,8 +249,9 @@ class AutoTyperApp:
             self.status_var.set(f"Error loading clipboard: {e}")
 
     def start_typing(self):
-        content = self.text_area.get("1.0", tk.END).strip() # Remove trailing newline from Text widget
-        if not content:
+        # "end-1c" leaves out the Text widget's trailing newline without copying the text again
+        content = self.text_area.get("1.0", "end-1c")
+        if not content or content.isspace():
             messagebox.showwarning("Empty", "Please enter or paste text to type.")
             return
 
@@ -249,21 +274,31 @@ class AutoTyperApp:
         self.set_state_ready()
 
     def update_progress(self, chars_typed, status_text):
-        # Must be thread-safe for Tkinter - use root.after() to run in main thread
-        def _update():
-            total = len(self.typer.text_to_type)
-            if total > 0:
-                pct = (chars_typed / total) * 100
-                self.progress_var.set(pct)
-            else:
-                self.progress_var.set(0)
-            
-            self.status_var.set(status_text)
+        # Must be thread-safe for Tkinter - use root.after() to run in main thread.
+        # Only the latest update is kept and applied at most every 50ms.
+        self._pending_update = (chars_typed, status_text)
+        if not self._update_scheduled:
+            self._update_scheduled = True
+            self.root.after(50, self._flush_update)
+
+    def _flush_update(self):
+        self._update_scheduled = False
+        if self._pending_update is None: return
+        chars_typed, status_text = self._pending_update
+        self._pending_update = None
+        
+        total = len(self.typer.text_to_type)
+        if total > 0:
+            pct = (chars_typed / total) * 100
+            self.progress_var.set(pct)
+        else:
+            self.progress_var.set(0)
         
-        self.root.after(0, _update)
+        self.status_var.set(status_text)
 
     def on_typing_finished(self, success):
         def _finish():
+            self._flush_update()
             self.set_state_ready()
             if success:
                 self.status_var.set("Typing Completed Successfully.")
@@ -2,14 +2,33 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import keyboard
 import pyperclip
+import asyncio
 import threading
+from enum import IntEnum
 import time
 import random
 import sys
 
+import _clipboard
+
 # Disable fail-safe if using pyautogui (we are using keyboard mostly, but careful with loops)
 # keyboard module doesn't have a fail-safe like pyautogui, so we rely on explicit stop checks
 
+# Lines per clipboard paste in Block mode
+BLOCK_LINES = 50
+
+class Mode(IntEnum):
+    NATURAL = 0
+    TURBO = 1
+    BLOCK = 2
+
+# Mode combobox labels; anything unrecognised types naturally
+MODE_NAMES = {
+    "Natural (Keystrokes)": Mode.NATURAL,
+    "Turbo (Instant Paste)": Mode.TURBO,
+    "Block (Line-by-Line)": Mode.BLOCK,
+}
+
 # --- Configuration & Theme ---
 COLORS = {
     'bg': '#1e1e1e',
@@ -24,140 +43,198 @@ COLORS = {
 
 # --- Auto-Typer Logic ---
 class AutoTyper:
-    def __init__(self):
+    def __init__(self, loop):
         self.running = False
         self.paused = False
-        self.stop_requested = False
         self.text_to_type = ""
-        self.mode = "Natural" # Natural, Turbo, Block
+        self.mode = Mode.NATURAL
         self.speed_cpm = 1200
         self.jitter = 0.1
-        self.typing_thread = None
+        
+        # Typing runs as a coroutine on the app's shared event loop thread
+        self.loop = loop
+        self.typing_future = None
+        self._mode_handlers = {
+            Mode.NATURAL: self._mode_natural,
+            Mode.TURBO: self._mode_turbo,
+            Mode.BLOCK: self._mode_block,
+        }
+        self._resume_event, self._stop_event = asyncio.run_coroutine_threadsafe(
+            self._make_events(), loop).result()
+        # Resolved once so pastes skip keyboard's hotkey-string parsing
+        self._ctrl_code = keyboard.key_to_scan_codes('ctrl')[0]
+        self._v_code = keyboard.key_to_scan_codes('v')[0]
+        # ESC arrives through a hook instead of polling the key state every character
+        keyboard.on_press_key('esc', self._on_esc_press)
+
+    async def _make_events(self):
+        # On 3.8/3.9 asyncio.Event binds to the loop current where it is built, so
+        # build the resume (set while not paused) and stop events on the loop thread
+        resume_event = asyncio.Event()
+        resume_event.set()
+        return resume_event, asyncio.Event()
+
+    def _signal(self, event, on=True):
+        # asyncio.Event is not thread-safe; flip it from the loop thread
+        self.loop.call_soon_threadsafe(event.set if on else event.clear)
+
+    def _on_esc_press(self, event):
+        if self.running: self.stop()
 
     def start_typing(self, text, mode, speed_cpm, progress_callback, finish_callback):
         if self.running: return
         
         self.text_to_type = text
-        self.mode = mode
+        self.mode = MODE_NAMES.get(mode, Mode.NATURAL)
         self.speed_cpm = speed_cpm
+        # Jitter bounds are fixed for the session: delay = base * (lo + span * random())
+        self._jitter_lo = 1.0 - self.jitter
+        self._jitter_span = 2.0 * self.jitter
         self.running = True
         self.paused = False
-        self.stop_requested = False
+        self._stop_event.clear()
+        self._signal(self._resume_event)
         
-        self.typing_thread = threading.Thread(
-            target=self._type_loop, 
-            args=(progress_callback, finish_callback), 
-            daemon=True
+        self.typing_future = asyncio.run_coroutine_threadsafe(
+            self._type_loop(progress_callback, finish_callback), 
+            self.loop
         )
-        self.typing_thread.start()
 
     def pause(self):
         self.paused = True
+        self._signal(self._resume_event, on=False)
 
     def resume(self):
         self.paused = False
+        self._signal(self._resume_event)
 
     def stop(self):
-        self.stop_requested = True
         self.running = False
         self.paused = False
+        self._signal(self._stop_event)
+        self._signal(self._resume_event)  # Wake a paused loop so it can exit
 
-    def _type_loop(self, progress_callback, finish_callback):
+    async def _type_loop(self, progress_callback, finish_callback):
         # Countdown
         for i in range(5, 0, -1):
-            if self.stop_requested: break
+            if self._stop_event.is_set(): break
             progress_callback(0, f"Starting in {i}s... SWITCH WINDOW!")
-            time.sleep(1)
+            await asyncio.sleep(1)
         
-        if self.stop_requested:
+        if self._stop_event.is_set():
             finish_callback(False)
             return
 
         progress_callback(0, "Typing...")
         
         try:
-            if self.mode == "Turbo (Instant Paste)":
-                self._mode_turbo()
-                progress_callback(100, "Paste Complete.")
-            
-            elif self.mode == "Block (Line-by-Line)":
-                self._mode_block(progress_callback)
-            
-            else: # Natural (Keystrokes)
-                self._mode_natural(progress_callback)
+            await self._mode_handlers[self.mode](progress_callback)
 
-            success = not self.stop_requested
+            success = not self._stop_event.is_set()
         except Exception as e:
             print(f"Error: {e}")
             success = False
 
         self.running = False
-        self.stop_requested = False 
         finish_callback(success)
 
-    def _wait_paused(self):
-        while self.paused:
-            if self.stop_requested: return True
-            time.sleep(0.1)
-        return False
+    async def _wait_paused(self):
+        # Blocks without polling until resumed (or stopped); skip the wait
+        # coroutine entirely in the common not-paused case
+        if not self._resume_event.is_set():
+            await self._resume_event.wait()
+        return self._stop_event.is_set()
 
     def _check_stop(self):
-        if self.stop_requested or keyboard.is_pressed('esc'):
-            self.stop_requested = True
-            return True
-        return False
-
-    def _mode_turbo(self):
+        return self._stop_event.is_set()
+
+    def _send_paste(self):
+        kpress, krelease = keyboard.press, keyboard.release
+        kpress(self._ctrl_code); kpress(self._v_code)
+        krelease(self._v_code); krelease(self._ctrl_code)
+
+    async def _paste(self, text):
+        if _clipboard.AVAILABLE:
+            # Set synchronously through user32; only wait (without blocking the
+            # loop) while another process holds the clipboard
+            for _ in range(50):
+                if _clipboard.copy(text): break
+                await asyncio.sleep(0.01)
+            else:
+                raise OSError("Clipboard is held by another process")
+        else:
+            pyperclip.copy(text)
+            # Paste as soon as the clipboard holds the text (xclip/wl-copy settle asynchronously)
+            for _ in range(10):
+                if pyperclip.paste() == text: break
+                await asyncio.sleep(0.01)
+        self._send_paste()
+
+    async def _mode_turbo(self, progress_callback):
         """Copies all text to clipboard and pastes once."""
-        pyperclip.copy(self.text_to_type)
-        time.sleep(0.1)
-        keyboard.send('ctrl+v')
-        time.sleep(0.1)
-
-    def _mode_block(self, progress_callback):
-        """Pastes line by line."""
-        lines = self.text_to_type.split('\n')
-        total_lines = len(lines)
+        await self._paste(self.text_to_type)
+        progress_callback(100, "Paste Complete.")
+        await asyncio.sleep(0.1)
+
+    async def _mode_block(self, progress_callback):
+        """Pastes BLOCK_LINES lines at a time."""
+        text = self.text_to_type
+        n = len(text)
+        total_lines = text.count('\n') + 1
+        # Chunks are sliced straight out of the text between newlines; no list of lines
+        pos = 0
+        end = 0
         
-        for idx, line in enumerate(lines):
+        while end < total_lines:
             if self._check_stop(): break
-            if self._wait_paused(): break # Handle pause logic if loop continues
-
-            # Copy line to clipboard
-            pyperclip.copy(line)
-            time.sleep(0.05)
-            keyboard.send('ctrl+v')
-            time.sleep(0.05)
-            keyboard.send('enter')
+            if await self._wait_paused(): break # Handle pause logic if loop continues
+
+            # Cut after the BLOCK_LINES-th newline (or at the end of the text);
+            # the newlines ride along in the paste instead of separate Enters
+            cut = pos
+            for _ in range(BLOCK_LINES):
+                end += 1
+                nxt = text.find('\n', cut)
+                cut = nxt + 1 if nxt >= 0 else n
+                if nxt < 0: break
+            await self._paste(text[pos:cut] + ('\n' if nxt < 0 else ''))
+            pos = cut
             
             # Progress
-            pct = int(((idx + 1) / total_lines) * 100)
-            progress_callback(pct, f"Pasting Line {idx+1}/{total_lines}")
+            pct = int((end / total_lines) * 100)
+            progress_callback(pct, f"Pasting Line {end}/{total_lines}")
             
-            # Small delay between lines
-            time.sleep(0.2)
+            # Let the target read the clipboard before the next chunk overwrites it
+            await asyncio.sleep(0.1)
 
-    def _mode_natural(self, progress_callback):
+    async def _mode_natural(self, progress_callback):
         """Types character by character using keystrokes (No Clipboard)."""
         base_delay = 60.0 / self.speed_cpm
         total_chars = len(self.text_to_type)
+        lo, span = self._jitter_lo, self._jitter_span
+        # Session-private generator: no other thread shares its state
+        rand = random.Random().random
+        # Report progress at most every 50 ms of wall time rather than on every char
+        clock = time.perf_counter
+        next_report = clock() + 0.05
         
         for idx, char in enumerate(self.text_to_type):
             if self._check_stop(): break
-            if self._wait_paused(): 
+            if await self._wait_paused(): 
                 if self._check_stop(): break # Re-check after pause
             
             # Type the char directly
             keyboard.write(char)
             
             # Progress update
-            if idx % 10 == 0:
+            if idx + 1 == total_chars or clock() >= next_report:
                 pct = int(((idx + 1) / total_chars) * 100)
                 progress_callback(pct, f"Typing... {pct}%")
+                next_report = clock() + 0.05
 
             # Random delay
-            delay = base_delay * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
-            time.sleep(delay)
+            delay = base_delay * (lo + span * rand())
+            await asyncio.sleep(delay)
 
 
 # --- GUI Application ---
@@ -168,7 +245,13 @@ class AutoTyperApp:
         self.root.geometry("650x550")
         self.root.configure(bg=COLORS['bg'])
         
-        self.typer = AutoTyper()
+        # One event loop thread for the app lifetime; typing sessions run on it as coroutines
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        
+        self.typer = AutoTyper(self.loop)
+        self._pending_update = None
+        self._update_scheduled = False
         
         self.setup_ui()
 
@@ -258,8 +341,9 @@ class AutoTyperApp:
             self.status_var.set(f"Clipboard Error: {e}")
 
     def start_typing(self):
-        content = self.text_area.get("1.0", tk.END).strip()
-        if not content:
+        # "end-1c" leaves out the Text widget's trailing newline without copying the text again
+        content = self.text_area.get("1.0", "end-1c")
+        if not content or content.isspace():
             messagebox.showwarning("Empty", "Are you typing invisible ink? Enter some text!")
             return
 
@@ -272,10 +356,23 @@ class AutoTyperApp:
         self.status_var.set("Stopping...")
 
     def update_progress(self, pct, text):
-        self.root.after(0, lambda: [self.progress_var.set(pct), self.status_var.set(text)])
+        # Keep only the latest update and apply it at most every 50ms
+        self._pending_update = (pct, text)
+        if not self._update_scheduled:
+            self._update_scheduled = True
+            self.root.after(50, self._flush_update)
+
+    def _flush_update(self):
+        self._update_scheduled = False
+        if self._pending_update is None: return
+        pct, text = self._pending_update
+        self._pending_update = None
+        self.progress_var.set(pct)
+        self.status_var.set(text)
 
     def on_finish(self, success):
         self.root.after(0, lambda: [
+            self._flush_update(),
             self.set_state_ready(),
             self.status_var.set("Done!" if success else "Stopped.")
         ])
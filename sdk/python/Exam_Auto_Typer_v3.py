@@ -1,19 +1,25 @@
+try:
+    # Optional: lets worker threads call Tk directly; must patch before tkinter is imported
+    import tkthread; tkthread.patch()
+except ImportError:
+    tkthread = None
 import tkinter as tk
 from tkinter import ttk, messagebox
-import keyboard
 import pyperclip
+import asyncio
 import threading
-import time
-import random
 import sys
 import logging
+import logging.handlers
+
+from auto_typer_core import AutoTyper
 
 # --- Logging Setup ---
-logging.basicConfig(
-    filename='auto_typer.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Records are buffered in memory and written when a session finishes (errors flush at once)
+_log_file = logging.FileHandler('auto_typer.log')
+_log_file.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+log_buffer = logging.handlers.MemoryHandler(capacity=1000, target=_log_file)
+logging.basicConfig(level=logging.INFO, handlers=[log_buffer])
 
 COLORS = {
     'bg': '#1e1e1e',
@@ -27,198 +33,6 @@ COLORS = {
     'success': '#00FF7F'
 }
 
-NEIGHBORS = {
-    'a': 'qwsz', 'b': 'vghn', 'c': 'xdfv', 'd': 'serfcx', 'e': 'wsdr', 'f': 'drtgv',
-    'g': 'ftyhb', 'h': 'gyunj', 'i': 'ujko', 'j': 'hunik', 'k': 'jiolm', 'l': 'kop',
-    'm': 'njk', 'n': 'bhjm', 'o': 'iklp', 'p': 'ol', 'q': 'wa', 'r': 'edft',
-    's': 'awedxz', 't': 'rfgy', 'u': 'yhji', 'v': 'cfgb', 'w': 'qase', 'x': 'zsdc',
-    'y': 'tghu', 'z': 'asx', ' ': ' '
-}
-
-class AutoTyper:
-    def __init__(self):
-        self.running = False
-        self.paused = False
-        self.stop_requested = False
-        self.text_to_type = ""
-        self.mode = "Natural"
-        self.speed_cpm = 1200
-        self.jitter = 0.1
-        self.typo_chance = 0.03
-        
-        self.typing_thread = None
-        self.last_esc_time = 0
-        
-        # Hook ESC key globally
-        keyboard.on_press_key('esc', self._on_esc_press)
-        self.status_callback = None # To update UI from key press
-
-    def set_status_callback(self, cb):
-        self.status_callback = cb
-
-    def _on_esc_press(self, event):
-        if not self.running: return
-        
-        curr_time = time.time()
-        # Double press detection (< 500ms)
-        if (curr_time - self.last_esc_time) < 0.5:
-            self.stop()
-            if self.status_callback: self.status_callback("STOPPED (Double ESC)")
-        else:
-            self.toggle_pause()
-            status = "PAUSED (ESC)" if self.paused else "RESUMED (ESC)"
-            if self.status_callback: self.status_callback(status)
-            
-        self.last_esc_time = curr_time
-
-    def toggle_pause(self):
-        self.paused = not self.paused
-        logging.info(f"Toggle Pause: {self.paused}")
-
-    def start_typing(self, text, mode, speed_cpm, progress_callback, finish_callback):
-        if self.running: return
-        
-        self.text_to_type = text.replace('\r\n', '\n')
-        self.mode = mode
-        self.speed_cpm = speed_cpm
-        self.running = True
-        self.paused = False
-        self.stop_requested = False
-        
-        self.typing_thread = threading.Thread(
-            target=self._type_loop, 
-            args=(progress_callback, finish_callback), 
-            daemon=True
-        )
-        self.typing_thread.start()
-
-    def stop(self):
-        self.stop_requested = True
-        self.running = False
-        self.paused = False
-
-    def _type_loop(self, progress_callback, finish_callback):
-        # Countdown
-        for i in range(5, 0, -1):
-            if self.stop_requested: break
-            progress_callback(0, f"Starting in {i}s... SWITCH WINDOW!")
-            time.sleep(1)
-        
-        if self.stop_requested:
-            finish_callback(False)
-            return
-
-        progress_callback(0, "Typing...")
-        
-        try:
-            if self.mode == "Turbo (Instant Paste)":
-                self._mode_turbo()
-                progress_callback(100, "Paste Complete.")
-            elif self.mode == "Block (Line-by-Line)":
-                self._mode_block(progress_callback)
-            elif "Super-Human" in self.mode:
-                self._mode_super_human(progress_callback)
-            else: # Natural
-                self._mode_natural(progress_callback)
-
-            success = not self.stop_requested
-        except Exception as e:
-            logging.error(f"Error: {e}")
-            print(e)
-            success = False
-
-        self.running = False
-        self.stop_requested = False 
-        finish_callback(success)
-
-    def _wait_if_paused(self):
-        while self.paused:
-            if self.stop_requested: return True
-            time.sleep(0.1)
-        return self.stop_requested
-
-    def _random_sleep(self, base_delay):
-        delay = base_delay * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
-        time.sleep(delay)
-
-    def _mode_turbo(self):
-        pyperclip.copy(self.text_to_type)
-        time.sleep(0.1)
-        keyboard.send('ctrl+v')
-
-    def _mode_block(self, progress_callback):
-        lines = self.text_to_type.split('\n')
-        total = len(lines)
-        for idx, line in enumerate(lines):
-            if self._wait_if_paused(): break
-            
-            pyperclip.copy(line)
-            time.sleep(0.05)
-            keyboard.send('ctrl+v')
-            time.sleep(0.05)
-            if idx < total - 1:
-                keyboard.send('enter')
-            
-            pct = int(((idx + 1) / total) * 100)
-            progress_callback(pct, f"Line {idx+1}/{total}")
-            time.sleep(0.3)
-
-    def _mode_natural(self, progress_callback):
-        base_delay = 60.0 / self.speed_cpm
-        total = len(self.text_to_type)
-        
-        for idx, char in enumerate(self.text_to_type):
-            if self._wait_if_paused(): break
-            
-            keyboard.write(char)
-            if idx % 10 == 0:
-                pct = int(((idx + 1) / total) * 100)
-                progress_callback(pct, f"Typing... {pct}%")
-            self._random_sleep(base_delay)
-
-    def _mode_super_human(self, progress_callback):
-        base_delay = 60.0 / self.speed_cpm
-        total = len(self.text_to_type)
-        
-        i = 0
-        while i < total:
-            if self._wait_if_paused(): break
-            
-            char = self.text_to_type[i]
-            
-            if char == '\n':
-                keyboard.write(char)
-                think_time = random.uniform(1.0, 3.0)
-                progress_callback(int(((i+1)/total)*100), "Thinking...")
-                time.sleep(think_time)
-                i += 1
-                continue
-
-            lower_char = char.lower()
-            if (random.random() < self.typo_chance) and (lower_char in NEIGHBORS):
-                typo_char = random.choice(NEIGHBORS[lower_char])
-                if char.isupper(): typo_char = typo_char.upper()
-                
-                keyboard.write(typo_char)
-                self._random_sleep(base_delay)
-                time.sleep(random.uniform(0.1, 0.3)) # Reaction
-                
-                keyboard.send('backspace')
-                time.sleep(random.uniform(0.05, 0.1))
-                
-                keyboard.write(char)
-                logging.info(f"Typo corrected: {typo_char}->{char}")
-            else:
-                keyboard.write(char)
-            
-            if i % 10 == 0:
-                pct = int(((i + 1) / total) * 100)
-                progress_callback(pct, f"Human Mode... {pct}%")
-            
-            self._random_sleep(base_delay)
-            i += 1
-
-
 class AutoTyperApp:
     def __init__(self, root):
         self.root = root
@@ -226,8 +40,14 @@ class AutoTyperApp:
         self.root.geometry("700x700")
         self.root.configure(bg=COLORS['bg'])
         
-        self.typer = AutoTyper()
+        # One event loop thread for the app lifetime; typing sessions run on it as coroutines
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        
+        self.typer = AutoTyper(self.loop)
         self.typer.set_status_callback(self.on_external_status)
+        self._pending_update = None
+        self._update_scheduled = False
         
         self.setup_ui()
 
@@ -309,8 +129,9 @@ class AutoTyperApp:
         except: pass
 
     def start_typing(self):
-        content = self.text_area.get("1.0", tk.END).strip()
-        if not content: return
+        # "end-1c" leaves out the Text widget's trailing newline without copying the text again
+        content = self.text_area.get("1.0", "end-1c")
+        if not content or content.isspace(): return
         self.set_state_typing()
         self.typer.start_typing(content, self.mode_var.get(), self.speed_var.get(), self.update_progress, self.on_finish)
 
@@ -330,17 +151,41 @@ class AutoTyperApp:
             self.status_var.set("Typing...")
 
     def update_progress(self, pct, text):
-        self.root.after(0, lambda: [self.progress_var.set(pct), self.status_var.set(text)])
+        # Keep only the latest update and apply it at most every 50ms
+        self._pending_update = (pct, text)
+        if not self._update_scheduled:
+            self._update_scheduled = True
+            self.root.after(50, self._flush_update)
+
+    def _flush_update(self):
+        self._update_scheduled = False
+        if self._pending_update is None: return
+        pct, text = self._pending_update
+        self._pending_update = None
+        self.progress_var.set(pct)
+        self.status_var.set(text)
 
     def on_external_status(self, status_text):
         # Called from thread when ESC is used
-        self.root.after(0, lambda: [
-            self.status_var.set(status_text),
-            self.update_pause_btn_state()
-        ])
+        self._call_ui(self._apply_status, status_text)
+
+    def _apply_status(self, status_text):
+        self.status_var.set(status_text)
+        self.update_pause_btn_state()
 
     def on_finish(self, success):
-        self.root.after(0, lambda: [self.set_state_ready(), self.status_var.set("Done!" if success else "Stopped.")])
+        log_buffer.flush()
+        self._call_ui(self._apply_finish, success)
+
+    def _apply_finish(self, success):
+        self._flush_update()
+        self.set_state_ready()
+        self.status_var.set("Done!" if success else "Stopped.")
+
+    def _call_ui(self, fn, *args):
+        # With tkthread the call is dispatched to the Tk thread for us; otherwise queue it
+        if tkthread: fn(*args)
+        else: self.root.after(0, fn, *args)
 
     def set_state_typing(self):
         self.btn_play.config(state=tk.DISABLED)
@@ -1,21 +1,35 @@
+try:
+    # Optional: lets worker threads call Tk directly; must patch before tkinter is imported
+    import tkthread; tkthread.patch()
+except ImportError:
+    tkthread = None
 import tkinter as tk
 from tkinter import ttk, messagebox
 import keyboard
 import pyperclip
+import asyncio
 import threading
+from enum import IntEnum
+from collections import namedtuple
 import time
 import random
+import math
 import sys
 import logging
+import logging.handlers
 import os
 
+import _clipboard
+import _sendinput
+
 # --- Logging Setup ---
 if not os.path.exists('logs'): os.makedirs('logs')
-logging.basicConfig(
-    filename='logs/auto_typer_v4.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Records are buffered in memory and written when a session finishes (errors flush at once)
+_log_file = logging.FileHandler('logs/auto_typer_v4.log')
+_log_file.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+log_buffer = logging.handlers.MemoryHandler(capacity=1000, target=_log_file)
+logging.basicConfig(level=logging.INFO, handlers=[log_buffer])
+logger = logging.getLogger(__name__)
 
 COLORS = {
     'bg': '#1e1e1e',
@@ -36,6 +50,39 @@ NEIGHBORS = {
     's': 'awedxz', 't': 'rfgy', 'u': 'yhji', 'v': 'cfgb', 'w': 'qase', 'x': 'zsdc',
     'y': 'tghu', 'z': 'asx', ' ': ' '
 }
+# Neighbour keys indexed by ord(char), None where a key has none; uppercase
+# entries are pre-uppercased so a typo keeps the case of the intended character
+_lut = [None] * 128
+for _k, _v in NEIGHBORS.items():
+    _lut[ord(_k)] = _v
+    _lut[ord(_k.upper())] = _v.upper()
+NEIGHBORS_LUT = tuple(_lut)
+
+# Max characters per keyboard.write call in Natural mode (keyboard paces them via delay=)
+WRITE_CHUNK = 8
+# Lines per clipboard paste in Block mode
+BLOCK_LINES = 50
+
+class Mode(IntEnum):
+    NATURAL = 0
+    TURBO = 1
+    BLOCK = 2
+    SUPER_HUMAN = 3
+
+# Mode combobox labels; anything unrecognised types naturally
+MODE_NAMES = {
+    "Natural (Keystrokes)": Mode.NATURAL,
+    "Turbo (Instant Paste)": Mode.TURBO,
+    "Block (Line-by-Line)": Mode.BLOCK,
+    "Super-Human (Typo+Correct)": Mode.SUPER_HUMAN,
+}
+
+# One step of a Super-Human plan, in text order. RUN types `text` at `delay` per char;
+# THINK types the newline in `text` then pauses `delay`; TYPO types the wrong key `typo`,
+# waits `react`, backspaces, waits `fix`, then types `text` and waits `delay`.
+# `end` is the text offset reached once the step is done.
+ACT_RUN, ACT_THINK, ACT_TYPO = range(3)
+Action = namedtuple('Action', 'kind text delay end typo react fix', defaults=(None, 0.0, 0.0))
 
 # --- Funny Speed Labels ---
 def get_speed_label(cpm):
@@ -46,28 +93,63 @@ def get_speed_label(cpm):
     return "🤖 Matrix Mode (Godlike)"
 
 class AutoTyper:
-    def __init__(self):
+    def __init__(self, loop):
         self.running = False
         self.paused = False
         self.pause_pending = False  # For Smart Pause
-        self.stop_requested = False
         self.text_to_type = ""
-        self.mode = "Natural"
+        self.mode = Mode.NATURAL
         self.speed_cpm = 1200
         self.jitter = 0.1
         self.typo_chance = 0.03
         
-        self.typing_thread = None
+        # Typing runs as a coroutine on the app's shared event loop thread
+        self.loop = loop
+        self.typing_future = None
+        self._mode_handlers = {
+            Mode.NATURAL: self._mode_natural,
+            Mode.TURBO: self._mode_turbo,
+            Mode.BLOCK: self._mode_block,
+            Mode.SUPER_HUMAN: self._mode_super_human,
+        }
+        self._resume_event, self._stop_event = asyncio.run_coroutine_threadsafe(
+            self._make_events(), loop).result()
         self.last_esc_time = 0
+        self._esc_hotkey = None
+        # Resolved once so typo corrections and pastes skip keyboard's hotkey-string parsing
+        self._bs_code = keyboard.key_to_scan_codes('backspace')[0]
+        self._ctrl_code = keyboard.key_to_scan_codes('ctrl')[0]
+        self._v_code = keyboard.key_to_scan_codes('v')[0]
+        # perf_counter() deadline for the next run on the SendInput path
+        self._next_t = 0.0
         
-        # Hook ESC key globally
-        keyboard.on_press_key('esc', self._on_esc_press)
         self.status_callback = None 
 
     def set_status_callback(self, cb):
         self.status_callback = cb
 
-    def _on_esc_press(self, event):
+    async def _make_events(self):
+        # On 3.8/3.9 asyncio.Event binds to the loop current where it is built, so
+        # build the resume (set while not paused) and stop events on the loop thread
+        resume_event = asyncio.Event()
+        resume_event.set()
+        return resume_event, asyncio.Event()
+
+    def _signal(self, event):
+        # asyncio.Event is not thread-safe; set it from the loop thread
+        self.loop.call_soon_threadsafe(event.set)
+
+    def _hook_esc(self):
+        # Global ESC only while a session runs (ESC does nothing when idle), so it
+        # works whichever window has focus and is the only ESC path
+        self._esc_hotkey = keyboard.add_hotkey('esc', self._on_esc_press, suppress=False)
+
+    def _unhook_esc(self):
+        if self._esc_hotkey is not None:
+            keyboard.remove_hotkey(self._esc_hotkey)
+            self._esc_hotkey = None
+
+    def _on_esc_press(self):
         if not self.running: return
         
         curr_time = time.time()
@@ -84,73 +166,75 @@ class AutoTyper:
         if self.paused:
             self.paused = False
             self.pause_pending = False
-            logging.info("Resumed")
+            self._signal(self._resume_event)
+            logger.info("Resumed")
             if self.status_callback: self.status_callback("RESUMED", paused=False)
         else:
             self.pause_pending = True
-            logging.info("Pause Pending (Smart Pause)...")
+            logger.info("Pause Pending (Smart Pause)...")
             if self.status_callback: self.status_callback("Pausing at next space...", paused=False)
 
     def start_typing(self, text, mode, speed_cpm, progress_callback, finish_callback):
         if self.running: return
         
-        self.text_to_type = text.replace('\r\n', '\n')
-        self.mode = mode
+        # Tk text is LF-only already; only pay for the copy when a CR is present
+        self.text_to_type = text.replace('\r\n', '\n') if '\r' in text else text
+        self.mode = MODE_NAMES.get(mode, Mode.NATURAL)
         self.speed_cpm = speed_cpm
+        # Jitter bounds are fixed for the session: delay = base * (lo + span * random())
+        self._jitter_lo = 1.0 - self.jitter
+        self._jitter_span = 2.0 * self.jitter
         self.running = True
         self.paused = False
         self.pause_pending = False
-        self.stop_requested = False
+        self._stop_event.clear()
+        self._signal(self._resume_event)
+        self._hook_esc()
+        _sendinput.begin_timer_period()
         
-        self.typing_thread = threading.Thread(
-            target=self._type_loop, 
-            args=(progress_callback, finish_callback), 
-            daemon=True
+        self.typing_future = asyncio.run_coroutine_threadsafe(
+            self._type_loop(progress_callback, finish_callback), 
+            self.loop
         )
-        self.typing_thread.start()
 
     def stop(self):
-        self.stop_requested = True
         self.running = False
         self.paused = False
         self.pause_pending = False
+        self._signal(self._stop_event)
+        self._signal(self._resume_event)  # Wake a paused loop so it can exit
 
-    def _type_loop(self, progress_callback, finish_callback):
+    async def _type_loop(self, progress_callback, finish_callback):
         # Countdown
         for i in range(5, 0, -1):
-            if self.stop_requested: break
+            if self._stop_event.is_set(): break
             progress_callback(0, f"Starting in {i}s... SWITCH WINDOW!")
-            time.sleep(1)
+            await asyncio.sleep(1)
         
-        if self.stop_requested:
+        if self._stop_event.is_set():
+            self._unhook_esc()
+            _sendinput.end_timer_period()
             finish_callback(False)
             return
 
         progress_callback(0, "Typing...")
         
         try:
-            if self.mode == "Turbo (Instant Paste)":
-                self._mode_turbo()
-                progress_callback(100, "Paste Complete.")
-            elif self.mode == "Block (Line-by-Line)":
-                self._mode_block(progress_callback)
-            elif "Super-Human" in self.mode:
-                self._mode_super_human(progress_callback)
-            else: # Natural
-                self._mode_natural(progress_callback)
-
-            success = not self.stop_requested
+            await self._mode_handlers[self.mode](progress_callback)
+
+            success = not self._stop_event.is_set()
         except Exception as e:
-            logging.error(f"Error: {e}")
+            logger.error("Error: %s", e)
             print(e)
             success = False
 
         self.running = False
-        self.stop_requested = False 
+        self._unhook_esc()
+        _sendinput.end_timer_period()
         finish_callback(success)
 
-    def _handle_smart_pause(self, current_char):
-        if self.stop_requested: return True
+    async def _handle_smart_pause(self, current_char):
+        if self._stop_event.is_set(): return True
         
         # Check if we should enter paused state
         if self.pause_pending:
@@ -158,99 +242,217 @@ class AutoTyper:
             if current_char in [' ', '\n', '\t']:
                 self.paused = True
                 self.pause_pending = False
+                self._resume_event.clear()
                 if self.status_callback: self.status_callback("PAUSED (Smart)", paused=True)
                 
-        # Wait loop while paused
-        while self.paused:
-            if self.stop_requested: return True
-            time.sleep(0.1)
+        # Blocks without polling until resumed (or stopped); skip the wait
+        # coroutine entirely in the common not-paused case
+        if not self._resume_event.is_set():
+            await self._resume_event.wait()
             
-        return False
-
-    def _random_sleep(self, base_delay):
-        delay = base_delay * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
-        time.sleep(delay)
-
-    def _mode_turbo(self):
-        pyperclip.copy(self.text_to_type)
-        time.sleep(0.1)
-        keyboard.send('ctrl+v')
-
-    def _mode_block(self, progress_callback):
-        lines = self.text_to_type.split('\n')
-        total = len(lines)
-        for idx, line in enumerate(lines):
-            if self.stop_requested: break
+        return self._stop_event.is_set()
+
+    async def _pace(self, delay):
+        # Sleep to an absolute deadline so timer overshoot doesn't accumulate run over run
+        now = time.perf_counter()
+        if self._next_t < now - 0.05:
+            self._next_t = now  # Resuming after a pause, think time or typo: don't burst to catch up
+        self._next_t += delay
+        slack = self._next_t - now
+        if slack > 0.002:
+            await asyncio.sleep(slack - 0.001)
+        while time.perf_counter() < self._next_t: pass
+
+    async def _send_run(self, run, delay):
+        if _sendinput.AVAILABLE:
+            # One SendInput for the whole run, then the run's share of the pacing
+            _sendinput.send_text(run)
+            await self._pace(delay * len(run))
+        else:
+            # keyboard paces the run itself
+            keyboard.write(run, delay=delay)
+            # Let stop/pause signals queued from other threads run
+            await asyncio.sleep(0)
+
+    def _send_paste(self):
+        kpress, krelease = keyboard.press, keyboard.release
+        kpress(self._ctrl_code); kpress(self._v_code)
+        krelease(self._v_code); krelease(self._ctrl_code)
+
+    async def _paste(self, text):
+        if _clipboard.AVAILABLE:
+            # Set synchronously through user32; only wait (without blocking the
+            # loop) while another process holds the clipboard
+            for _ in range(50):
+                if _clipboard.copy(text): break
+                await asyncio.sleep(0.01)
+            else:
+                raise OSError("Clipboard is held by another process")
+        else:
+            pyperclip.copy(text)
+            # Paste as soon as the clipboard holds the text (xclip/wl-copy settle asynchronously)
+            for _ in range(10):
+                if pyperclip.paste() == text: break
+                await asyncio.sleep(0.01)
+        self._send_paste()
+
+    async def _mode_turbo(self, progress_callback):
+        await self._paste(self.text_to_type)
+        progress_callback(100, "Paste Complete.")
+
+    async def _mode_block(self, progress_callback):
+        text = self.text_to_type
+        n = len(text)
+        total = text.count('\n') + 1
+        # Chunks are sliced straight out of the text between newlines; no list of lines
+        pos = 0
+        end = 0
+        while end < total:
+            if self._stop_event.is_set(): break
             
             # Simple pause check between lines for block mode
-            while self.paused or self.pause_pending:
-                 self.paused = True; self.pause_pending = False; time.sleep(0.1); 
-                 if self.stop_requested: break
+            if self.pause_pending:
+                self.paused = True
+                self.pause_pending = False
+                self._resume_event.clear()
+            await self._resume_event.wait()
+            if self._stop_event.is_set(): break
             
-            pyperclip.copy(line)
-            time.sleep(0.05)
-            keyboard.send('ctrl+v')
-            time.sleep(0.05)
-            if idx < total - 1:
-                keyboard.send('enter')
+            # Cut after the BLOCK_LINES-th newline (or at the end of the text);
+            # the newlines ride along in the paste instead of separate Enters
+            cut = pos
+            for _ in range(BLOCK_LINES):
+                end += 1
+                nxt = text.find('\n', cut)
+                cut = nxt + 1 if nxt >= 0 else n
+                if nxt < 0: break
+            await self._paste(text[pos:cut])
+            pos = cut
             
-            pct = int(((idx + 1) / total) * 100)
-            progress_callback(pct, f"Line {idx+1}/{total}")
-            time.sleep(0.3)
+            pct = int((end / total) * 100)
+            progress_callback(pct, f"Line {end}/{total}")
+            # Let the target read the clipboard before the next chunk overwrites it
+            await asyncio.sleep(0.1)
 
-    def _mode_natural(self, progress_callback):
+    async def _mode_natural(self, progress_callback):
         base_delay = 60.0 / self.speed_cpm
-        total = len(self.text_to_type)
+        text = self.text_to_type
+        total = len(text)
+        lo, span = self._jitter_lo, self._jitter_span
+        # Session-private generator: no other thread shares its state
+        rand = random.Random().random
+        # Report progress at most every 50 ms of wall time rather than on every run
+        clock = time.perf_counter
+        next_report = clock() + 0.05
         
-        for idx, char in enumerate(self.text_to_type):
-            if self._handle_smart_pause(char): break
+        # Runs end before whitespace so Smart Pause still lands between words
+        start = 0
+        while start < total:
+            if await self._handle_smart_pause(text[start]): break
             
-            keyboard.write(char)
-            if idx % 10 == 0:
-                pct = int(((idx + 1) / total) * 100)
+            end = start + 1
+            while end < total and end - start < WRITE_CHUNK and text[end] not in ' \n\t':
+                end += 1
+            
+            # Jitter is drawn once per run
+            await self._send_run(text[start:end], base_delay * (lo + span * rand()))
+            if end == total or clock() >= next_report:
+                pct = int((end / total) * 100)
                 progress_callback(pct, f"Typing... {pct}%")
-            self._random_sleep(base_delay)
+                next_report = clock() + 0.05
+            start = end
 
-    def _mode_super_human(self, progress_callback):
+    def _plan_super_human(self):
+        # Every random draw happens here, before typing starts; the paced loop
+        # in _mode_super_human only writes and sleeps
         base_delay = 60.0 / self.speed_cpm
-        total = len(self.text_to_type)
+        text = self.text_to_type
+        total = len(text)
+        typo_chance = self.typo_chance
+        lo, span = self._jitter_lo, self._jitter_span
+        # Session-private generator: no other thread shares its state
+        rng = random.Random()
+        rand = rng.random
+        uniform = rng.uniform
+        choice = rng.choice
+        neighbors_lut = NEIGHBORS_LUT
+        # Typo positions come from geometric gaps between Bernoulli(typo_chance) hits,
+        # so the RNG runs once per typo rather than once per character
+        typos = {}
+        if typo_chance > 0:
+            log_q = math.log1p(-typo_chance) if typo_chance < 1 else -math.inf
+            i = -1
+            while True:
+                i += 1 + int(math.log(1.0 - rand()) / log_q)
+                if i >= total: break
+                o = ord(text[i])
+                nb = neighbors_lut[o] if o < 128 else None
+                if nb: typos[i] = choice(nb)
         
-        i = 0
-        while i < total:
-            char = self.text_to_type[i]
-            if self._handle_smart_pause(char): break
-            
+        plan = []
+        append = plan.append
+        start = 0
+        while start < total:
+            char = text[start]
             if char == '\n':
-                keyboard.write(char)
-                think_time = random.uniform(1.0, 3.0)
-                progress_callback(int(((i+1)/total)*100), "Thinking...")
-                time.sleep(think_time)
-                i += 1
+                append(Action(ACT_THINK, char, uniform(1.0, 3.0), start + 1))
+                start += 1
                 continue
 
-            lower_char = char.lower()
-            if (random.random() < self.typo_chance) and (lower_char in NEIGHBORS):
-                typo_char = random.choice(NEIGHBORS[lower_char])
-                if char.isupper(): typo_char = typo_char.upper()
-                
-                keyboard.write(typo_char)
-                self._random_sleep(base_delay)
-                time.sleep(random.uniform(0.1, 0.3)) # Reaction
-                
-                keyboard.send('backspace')
-                time.sleep(random.uniform(0.05, 0.1))
-                
-                keyboard.write(char)
-                logging.info(f"Typo corrected: {typo_char}->{char}")
-            else:
-                keyboard.write(char)
+            typo_char = typos.get(start)
+            if typo_char is not None:
+                # Reaction covers the wrong key's own keystroke delay
+                react = base_delay * (lo + span * rand()) + uniform(0.1, 0.3)
+                append(Action(ACT_TYPO, char, base_delay * (lo + span * rand()), start + 1,
+                              typo_char, react, uniform(0.05, 0.1)))
+                start += 1
+                continue
             
-            if i % 10 == 0:
-                pct = int(((i + 1) / total) * 100)
-                progress_callback(pct, f"Human Mode... {pct}%")
+            # Clean run up to the next typo, newline or word boundary
+            end = start + 1
+            while end < total and end - start < WRITE_CHUNK and end not in typos and text[end] not in ' \n\t':
+                end += 1
+            append(Action(ACT_RUN, text[start:end], base_delay * (lo + span * rand()), end))
+            start = end
+        return plan
+
+    async def _mode_super_human(self, progress_callback):
+        total = len(self.text_to_type)
+        plan = self._plan_super_human()
+        # Bind hot-loop lookups to locals
+        kwrite = keyboard.write
+        kpress = keyboard.press
+        krelease = keyboard.release
+        bs_code = self._bs_code
+        sleep = asyncio.sleep
+        send_run = self._send_run
+        # Report progress at most every 50 ms of wall time rather than on every run
+        clock = time.perf_counter
+        next_report = clock() + 0.05
+        
+        for kind, text, delay, end, typo_char, react, fix in plan:
+            if await self._handle_smart_pause(text[0]): break
             
-            self._random_sleep(base_delay)
-            i += 1
+            if kind == ACT_RUN:
+                await send_run(text, delay)
+                if end == total or clock() >= next_report:
+                    pct = int((end / total) * 100)
+                    progress_callback(pct, f"Human Mode... {pct}%")
+                    next_report = clock() + 0.05
+            elif kind == ACT_THINK:
+                kwrite(text)
+                progress_callback(int((end / total) * 100), "Thinking...")
+                await sleep(delay)
+            else: # ACT_TYPO
+                kwrite(typo_char)
+                await sleep(react)
+                kpress(bs_code); krelease(bs_code)
+                await sleep(fix)
+                kwrite(text)
+                logger.debug("Typo corrected: %s->%s", typo_char, text)
+                await sleep(delay)
+                if end == total:
+                    progress_callback(100, "Human Mode... 100%")
 
 
 class AutoTyperApp:
@@ -260,8 +462,14 @@ class AutoTyperApp:
         self.root.geometry("700x700")
         self.root.configure(bg=COLORS['bg'])
         
-        self.typer = AutoTyper()
+        # One event loop thread for the app lifetime; typing sessions run on it as coroutines
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        
+        self.typer = AutoTyper(self.loop)
         self.typer.set_status_callback(self.on_external_status)
+        self._pending_update = None
+        self._update_scheduled = False
         
         self.setup_ui()
 
@@ -354,8 +562,9 @@ class AutoTyperApp:
         self.speed_label_var.set(get_speed_label(cpm))
 
     def start_typing(self):
-        content = self.text_area.get("1.0", tk.END).strip()
-        if not content: return
+        # "end-1c" leaves out the Text widget's trailing newline without copying the text again
+        content = self.text_area.get("1.0", "end-1c")
+        if not content or content.isspace(): return
         self.set_state_typing()
         self.typer.start_typing(content, self.mode_var.get(), self.speed_var.get(), self.update_progress, self.on_finish)
 
@@ -378,16 +587,40 @@ class AutoTyperApp:
             self.status_var.set("Typing...")
 
     def update_progress(self, pct, text):
-        self.root.after(0, lambda: [self.progress_var.set(pct), self.status_var.set(text)])
+        # Keep only the latest update and apply it at most every 50ms
+        self._pending_update = (pct, text)
+        if not self._update_scheduled:
+            self._update_scheduled = True
+            self.root.after(50, self._flush_update)
+
+    def _flush_update(self):
+        self._update_scheduled = False
+        if self._pending_update is None: return
+        pct, text = self._pending_update
+        self._pending_update = None
+        self.progress_var.set(pct)
+        self.status_var.set(text)
 
     def on_external_status(self, status_text, paused):
-        self.root.after(0, lambda: [
-            self.status_var.set(status_text),
-            self.update_pause_btn_state()
-        ])
+        self._call_ui(self._apply_status, status_text)
+
+    def _apply_status(self, status_text):
+        self.status_var.set(status_text)
+        self.update_pause_btn_state()
 
     def on_finish(self, success):
-        self.root.after(0, lambda: [self.set_state_ready(), self.status_var.set("Done!" if success else "Stopped.")])
+        log_buffer.flush()
+        self._call_ui(self._apply_finish, success)
+
+    def _apply_finish(self, success):
+        self._flush_update()
+        self.set_state_ready()
+        self.status_var.set("Done!" if success else "Stopped.")
+
+    def _call_ui(self, fn, *args):
+        # With tkthread the call is dispatched to the Tk thread for us; otherwise queue it
+        if tkthread: fn(*args)
+        else: self.root.after(0, fn, *args)
 
     def set_state_typing(self):
         self.btn_play.config(state=tk.DISABLED)
@@ -0,0 +1,75 @@
+"""Direct CF_UNICODETEXT clipboard writes through user32 (Windows only).
+
+copy() sets the text in a single open/empty/set/close sequence, so the data
+is in place when it returns. It does not retry or sleep while another process
+holds the clipboard; callers on the event loop wait with asyncio.sleep instead.
+"""
+import ctypes
+import sys
+
+AVAILABLE = sys.platform == 'win32'
+
+if AVAILABLE:
+    from ctypes import wintypes
+
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+
+    _user32 = ctypes.WinDLL('user32', use_last_error=True)
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+
+    _user32.CreateWindowExA.argtypes = (
+        wintypes.DWORD, wintypes.LPCSTR, wintypes.LPCSTR, wintypes.DWORD,
+        ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+        wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID)
+    _user32.CreateWindowExA.restype = wintypes.HWND
+    _user32.DestroyWindow.argtypes = (wintypes.HWND,)
+    _user32.DestroyWindow.restype = wintypes.BOOL
+    _user32.OpenClipboard.argtypes = (wintypes.HWND,)
+    _user32.OpenClipboard.restype = wintypes.BOOL
+    _user32.EmptyClipboard.restype = wintypes.BOOL
+    _user32.CloseClipboard.restype = wintypes.BOOL
+    _user32.SetClipboardData.argtypes = (wintypes.UINT, wintypes.HANDLE)
+    _user32.SetClipboardData.restype = wintypes.HANDLE
+    _kernel32.GlobalAlloc.argtypes = (wintypes.UINT, ctypes.c_size_t)
+    _kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+    _kernel32.GlobalLock.argtypes = (wintypes.HGLOBAL,)
+    _kernel32.GlobalLock.restype = wintypes.LPVOID
+    _kernel32.GlobalUnlock.argtypes = (wintypes.HGLOBAL,)
+    _kernel32.GlobalFree.argtypes = (wintypes.HGLOBAL,)
+    _kernel32.GlobalFree.restype = wintypes.HGLOBAL
+
+
+def copy(text):
+    """Replace the clipboard contents with text as CF_UNICODETEXT.
+
+    Makes a single attempt and returns False if another process holds the
+    clipboard; the caller decides how to wait before retrying.
+    """
+    # Clipboard owner; with a NULL owner EmptyClipboard makes SetClipboardData fail.
+    # The calling thread pumps no messages, so the window only lives for this call.
+    hwnd = _user32.CreateWindowExA(0, b"STATIC", None, 0, 0, 0, 0, 0, None, None, None, None)
+    if not hwnd: raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        if not _user32.OpenClipboard(hwnd): return False
+        try:
+            data = text.encode('utf-16-le') + b'\0\0'
+            handle = _kernel32.GlobalAlloc(GMEM_MOVEABLE, len(data))
+            if not handle: raise ctypes.WinError(ctypes.get_last_error())
+            ptr = _kernel32.GlobalLock(handle)
+            if not ptr:
+                _kernel32.GlobalFree(handle)
+                raise ctypes.WinError(ctypes.get_last_error())
+            ctypes.memmove(ptr, data, len(data))
+            _kernel32.GlobalUnlock(handle)
+
+            _user32.EmptyClipboard()
+            if not _user32.SetClipboardData(CF_UNICODETEXT, handle):
+                # Ownership only passes to the system on success
+                _kernel32.GlobalFree(handle)
+                raise ctypes.WinError(ctypes.get_last_error())
+        finally:
+            _user32.CloseClipboard()
+    finally:
+        _user32.DestroyWindow(hwnd)
+    return True
@@ -0,0 +1,91 @@
+"""Batched keystrokes through user32.SendInput (Windows only).
+
+keyboard.write issues one SendInput per character; send_text builds the
+whole run as an INPUT array and hands it to the kernel in a single call.
+"""
+import ctypes
+import sys
+
+AVAILABLE = sys.platform == 'win32'
+
+if AVAILABLE:
+    from ctypes import wintypes
+
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_KEYUP = 0x0002
+    KEYEVENTF_UNICODE = 0x0004
+    # Unicode events for these are ignored by most apps; send the virtual key instead
+    VIRTUAL_KEYS = {'\n': 0x0D, '\t': 0x09}  # VK_RETURN, VK_TAB
+
+    ULONG_PTR = ctypes.c_size_t
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [
+            ("wVk", wintypes.WORD),
+            ("wScan", wintypes.WORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ULONG_PTR),
+        ]
+
+    class MOUSEINPUT(ctypes.Structure):
+        # Largest member of the INPUT union; only here so sizeof(INPUT) is right
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ULONG_PTR),
+        ]
+
+    class _INPUTUNION(ctypes.Union):
+        _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT)]
+
+    class INPUT(ctypes.Structure):
+        _anonymous_ = ("u",)
+        _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+    # Private handle so the argtypes below don't leak into the shared windll.user32
+    _user32 = ctypes.WinDLL('user32', use_last_error=True)
+    _SendInput = _user32.SendInput
+    _SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+    _SendInput.restype = wintypes.UINT
+
+    _winmm = ctypes.WinDLL('winmm')
+
+
+def begin_timer_period():
+    """Raise the system timer resolution to 1 ms (sleep granularity is ~15.6 ms otherwise)."""
+    if AVAILABLE: _winmm.timeBeginPeriod(1)
+
+
+def end_timer_period():
+    """Undo begin_timer_period; calls must be paired."""
+    if AVAILABLE: _winmm.timeEndPeriod(1)
+
+def send_text(text):
+    """Type text with one SendInput call (a down/up event pair per UTF-16 unit)."""
+    keys = []
+    for char in text:
+        if char == '\r': continue
+        vk = VIRTUAL_KEYS.get(char)
+        if vk is not None:
+            keys.append((vk, 0, 0))
+        else:
+            units = char.encode('utf-16-le')
+            for i in range(0, len(units), 2):
+                keys.append((0, int.from_bytes(units[i:i + 2], 'little'), KEYEVENTF_UNICODE))
+    if not keys: return
+
+    events = (INPUT * (2 * len(keys)))()
+    for i, (vk, scan, flags) in enumerate(keys):
+        down, up = events[2 * i], events[2 * i + 1]
+        down.type = up.type = INPUT_KEYBOARD
+        down.ki.wVk = up.ki.wVk = vk
+        down.ki.wScan = up.ki.wScan = scan
+        down.ki.dwFlags = flags
+        up.ki.dwFlags = flags | KEYEVENTF_KEYUP
+
+    if _SendInput(len(events), events, ctypes.sizeof(INPUT)) != len(events):
+        raise ctypes.WinError(ctypes.get_last_error())
@@ -0,0 +1,15 @@
+"""Optional speed build: compile the v3 typing engine with Cython.
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+The resulting auto_typer_core extension is picked up ahead of
+auto_typer_core.py; delete it to go back to the pure-Python engine.
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="auto_typer_core",
+    ext_modules=cythonize("auto_typer_core.py", language_level=3),
+)